@@ -5,8 +5,11 @@ Simple PDF RAG CLI for document Q&A with OCR capabilities
 import os
 import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
 from rag.document_loader import load_document, scan_directory, is_supported_file
-from rag.vector_store import get_vector_store, add_documents, similarity_search
+from rag.vector_store import get_vector_store, add_documents, delete_documents, similarity_search
+from rag.manifest import get_manifest, check_file, stale_chunk_ids, record_file
 from rag.llm import get_llm_model, generate_response
 import logging
 
@@ -17,6 +20,9 @@ logger = logging.getLogger(__name__)
 
 # Constants
 DEFAULT_DB_DIR = "db"
+# Chunks are embedded and added in batches of this size; per-file batches are
+# often tiny (<50 chunks) and underutilize the embedding model
+EMBED_BATCH_SIZE = 256
 
 def ingest_documents(args):
     """
@@ -52,10 +58,35 @@ def ingest_documents(args):
         else:
             print(f"Path not found: {path}")
     
+    # Skip files whose content is unchanged since the last run: OCR and
+    # embedding are the expensive steps, and a stat + partial hash per file
+    # is enough to tell. Signatures are kept for recording after ingestion.
+    manifest = get_manifest(db_path)
+    signatures = {}
+    skipped_files = 0
+    remaining_files = []
+
+    for file_path in files_to_ingest:
+        abs_path = os.path.abspath(file_path)
+        try:
+            unchanged, signatures[abs_path] = check_file(manifest, abs_path)
+        except OSError as e:
+            print(f"  Error checking {file_path}: {e}")
+            continue
+
+        if unchanged and not args.force:
+            skipped_files += 1
+        else:
+            remaining_files.append(file_path)
+
+    if skipped_files:
+        print(f"Skipping {skipped_files} unchanged file(s) already in the store")
+    files_to_ingest = remaining_files
+
     # Load and add documents
     total_files = len(files_to_ingest)
     successful_files = 0
-    
+
     # Set up OCR options if OCR is enabled
     ocr_options = None
     if args.ocr:
@@ -63,22 +94,122 @@ def ingest_documents(args):
             'engine': args.ocr_engine,
             'lang': args.ocr_lang,
             'dpi': args.ocr_dpi,
+            'num_workers': args.ocr_workers,
+            'batch_size': args.ocr_batch_size,
+            'grayscale': args.ocr_grayscale,
+            'preprocess': args.ocr_preprocess,
             'use_gpu': args.gpu,
             'tesseract_cmd': args.tesseract_cmd,
             'tessdata_dir': args.tessdata_dir
         }
-    
-    for i, file_path in enumerate(files_to_ingest, 1):
-        print(f"[{i}/{total_files}] Loading {file_path}...")
+
+        # Warm the memoized OCR engine once before the file loop so every
+        # OCR'd file reuses the same instance (EasyOCR model load alone is
+        # multiple seconds). Falls back to lazy construction on failure.
         try:
-            documents = load_document(file_path, ocr_enabled=args.ocr, ocr_options=ocr_options)
-            add_documents(vector_store, documents)
-            print(f"  Loaded and added {len(documents)} chunks")
-            successful_files += 1
+            from rag.ocr import get_ocr_engine
+            get_ocr_engine(args.ocr_engine, lang=args.ocr_lang, dpi=args.ocr_dpi,
+                           use_gpu=args.gpu, batch_size=args.ocr_batch_size,
+                           tesseract_cmd=args.tesseract_cmd, tessdata_dir=args.tessdata_dir,
+                           preprocess=args.ocr_preprocess)
         except Exception as e:
-            print(f"  Error processing {file_path}: {e}")
+            logger.warning(f"Could not pre-initialize OCR engine: {e}. Will initialize lazily if needed.")
+
+
+    # Accumulate chunks across files and flush in batches, so the embedding
+    # model sees large batches instead of one small batch per file
+    pending_chunks = []
+    pending_files = []
+
+    def add_and_record(chunks, files):
+        nonlocal successful_files
+        chunk_ids = add_documents(vector_store, chunks) or []
+        successful_files += len(files)
+
+        # Only after a successful add: drop each file's chunks from its
+        # previous ingestion and record the new IDs. Deleting up front
+        # would leave a file gone from the store but marked current in
+        # the manifest whenever the add failed (e.g. a forced re-ingest
+        # hitting a transient embedding error) — and every later run
+        # would skip it as unchanged.
+        offset = 0
+        for abs_path, chunk_count in files:
+            delete_documents(vector_store, stale_chunk_ids(manifest, abs_path))
+            if abs_path in signatures:
+                record_file(manifest, abs_path, signatures[abs_path],
+                            chunk_ids[offset:offset + chunk_count])
+            offset += chunk_count
+
+    def flush_chunks():
+        if not pending_chunks:
+            return
+        try:
+            add_and_record(pending_chunks, pending_files)
+            print(f"  Added {len(pending_chunks)} chunks from {len(pending_files)} file(s)")
+        except Exception as e:
+            # A batch spans several files; retry each one on its own so a
+            # single bad file or a transient error doesn't discard its
+            # neighbors' chunks
+            print(f"  Error adding batch of {len(pending_chunks)} chunks, retrying per file: {e}")
+            offset = 0
+            for abs_path, chunk_count in pending_files:
+                try:
+                    add_and_record(pending_chunks[offset:offset + chunk_count],
+                                   [(abs_path, chunk_count)])
+                except Exception as file_error:
+                    print(f"  Error adding chunks from {abs_path}: {file_error}")
+                offset += chunk_count
+        pending_chunks.clear()
+        pending_files.clear()
+
+    # Load files on a bounded process pool; document parsing is CPU-bound
+    # Python orchestration around GIL-releasing C code, so many small files
+    # scale close to linearly. Serialized when EasyOCR runs on the GPU —
+    # concurrent processes would fight over it.
+    use_pool = total_files > 1 and not (args.ocr and args.ocr_engine == 'easyocr' and args.gpu)
+
+    if use_pool:
+        # Each worker loads whole files in parallel already, so disable the
+        # nested per-page OCR pool inside the workers
+        worker_ocr_options = dict(ocr_options, num_workers=1) if ocr_options else None
+
+        with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4)) as executor:
+            futures = {
+                executor.submit(load_document, file_path, args.ocr, worker_ocr_options): file_path
+                for file_path in files_to_ingest
+            }
+
+            for future in tqdm(as_completed(futures), total=total_files, desc="Ingesting"):
+                file_path = futures[future]
+                try:
+                    documents = future.result()
+                    pending_chunks.extend(documents)
+                    pending_files.append((os.path.abspath(file_path), len(documents)))
+                except Exception as e:
+                    print(f"  Error processing {file_path}: {e}")
+
+                if len(pending_chunks) >= EMBED_BATCH_SIZE:
+                    flush_chunks()
+    else:
+        for i, file_path in enumerate(files_to_ingest, 1):
+            print(f"[{i}/{total_files}] Loading {file_path}...")
+            try:
+                documents = load_document(file_path, ocr_enabled=args.ocr, ocr_options=ocr_options)
+                pending_chunks.extend(documents)
+                pending_files.append((os.path.abspath(file_path), len(documents)))
+                print(f"  Loaded {len(documents)} chunks")
+            except Exception as e:
+                print(f"  Error processing {file_path}: {e}")
+
+            if len(pending_chunks) >= EMBED_BATCH_SIZE:
+                flush_chunks()
+
+    flush_chunks()
     
-    print(f"\nIngestion complete: {successful_files}/{total_files} files processed successfully")
+    summary = f"\nIngestion complete: {successful_files}/{total_files} files processed successfully"
+    if skipped_files:
+        summary += f" ({skipped_files} unchanged file(s) skipped)"
+    print(summary)
     print(f"Vector store location: {db_path}")
 
 def answer_question(args):
@@ -140,6 +271,8 @@ def main():
                               help="Recursively scan directories for files (default: True)")
     ingest_parser.add_argument("--no-recursive", action="store_false", dest="recursive",
                               help="Do not recursively scan directories")
+    ingest_parser.add_argument("--force", action="store_true", default=False,
+                              help="Re-ingest files even if their content is unchanged since the last run")
     
     # OCR options
     ingest_parser.add_argument("--ocr", action="store_true", default=False,
@@ -150,6 +283,14 @@ def main():
                               help="Language code(s) for OCR (e.g., 'eng' for English, 'tha+eng' for Thai and English)")
     ingest_parser.add_argument("--ocr-dpi", type=int, default=300,
                               help="DPI setting for PDF to image conversion (default: 300)")
+    ingest_parser.add_argument("--ocr-workers", type=int, default=None,
+                              help="Number of worker processes for page-parallel OCR (default: min(CPU count, 4); only used with Tesseract)")
+    ingest_parser.add_argument("--ocr-batch-size", type=int, default=8,
+                              help="Number of pages per OCR batch (default: 8; only used with EasyOCR)")
+    ingest_parser.add_argument("--no-ocr-grayscale", action="store_false", dest="ocr_grayscale", default=True,
+                              help="Render pages as RGB instead of grayscale for Tesseract OCR")
+    ingest_parser.add_argument("--ocr-preprocess", choices=["none", "otsu", "otsu+deskew"], default="none",
+                              help="Image preprocessing before Tesseract OCR (requires OpenCV; default: none)")
     ingest_parser.add_argument("--tesseract-cmd", 
                               help="Path to Tesseract executable (if not in PATH)")
     ingest_parser.add_argument("--tessdata-dir",
@@ -2,115 +2,214 @@
 Document loader module for RAG system with OCR support
 """
 import os
+import re
 import tempfile
-import pandas as pd
-from typing import List, Set, Optional, Dict, Any, Union
-from pathlib import Path
-from langchain_community.document_loaders import TextLoader, PyPDFLoader, Docx2txtLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import fitz  # PyMuPDF
-from PIL import Image
-import io
+from typing import List, Optional, Dict, Any, Union
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Heavy dependencies (fitz, pandas, langchain loaders, the text splitter) are
+# imported lazily inside the functions that need them: the query command
+# imports this module but never loads documents, and shouldn't pay their
+# import time and RSS on every CLI start.
+
 logger = logging.getLogger(__name__)
 
-# Supported file extensions
-SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.txt', '.md', '.csv', '.xlsx'}
+# Page markers emitted by convert_pdf_to_text
+_PAGE_MARKER_RE = re.compile(r'^--- Page (\d+) ---$', re.MULTILINE)
+
+# Shared splitter instance: building one per load_document call re-creates
+# the separator list every file. str.__len__ skips an attribute lookup per
+# length callback, and the separators are plain strings, not regexes.
+_TEXT_SPLITTER = None
+
+def _get_text_splitter():
+    global _TEXT_SPLITTER
+    if _TEXT_SPLITTER is None:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        _TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200,
+            length_function=str.__len__,
+            is_separator_regex=False,
+        )
+    return _TEXT_SPLITTER
+
+# Supported file extensions (lowercase, without the dot)
+SUPPORTED_EXTENSIONS = frozenset({'pdf', 'docx', 'txt', 'md', 'csv', 'xlsx'})
 
 def is_supported_file(file_path: str) -> bool:
     """
     Check if a file is supported for ingestion
-    
+
     Args:
         file_path: Path to the file
-        
+
     Returns:
         True if the file is supported, False otherwise
     """
-    _, file_extension = os.path.splitext(file_path)
-    return file_extension.lower() in SUPPORTED_EXTENSIONS
+    _, sep, extension = file_path.rpartition('.')
+    return bool(sep) and extension.lower() in SUPPORTED_EXTENSIONS
 
 def scan_directory(directory_path: str, recursive: bool = True) -> List[str]:
     """
     Scan a directory for supported files
-    
+
     Args:
         directory_path: Path to the directory
         recursive: Whether to scan subdirectories recursively
-        
+
     Returns:
         List of file paths
     """
     if not os.path.isdir(directory_path):
         raise ValueError(f"Not a directory: {directory_path}")
-    
+
     supported_files = []
-    
-    # Walk through directory
-    if recursive:
-        for root, _, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if is_supported_file(file_path):
-                    supported_files.append(file_path)
-    else:
-        # Non-recursive scan
-        for item in os.listdir(directory_path):
-            file_path = os.path.join(directory_path, item)
-            if os.path.isfile(file_path) and is_supported_file(file_path):
-                supported_files.append(file_path)
-    
+
+    # Walk with os.scandir: DirEntry.is_file/is_dir use cached dirent data,
+    # avoiding an extra stat and string handling per entry (noticeable on
+    # directories with many files). Hidden directories are skipped.
+    stack = [directory_path]
+
+    while stack:
+        current_dir = stack.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not entry.name.startswith('.'):
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and is_supported_file(entry.name):
+                        supported_files.append(entry.path)
+        except OSError as e:
+            logger.warning(f"Could not scan directory {current_dir}: {e}")
+
     return supported_files
 
-def needs_ocr(pdf_path: str) -> bool:
+def needs_ocr(pdf: Union[str, "fitz.Document"]) -> bool:
     """
     Check if a PDF needs OCR processing by looking for image content or lack of text
-    
+
     Args:
-        pdf_path: Path to the PDF file
-    
+        pdf: Path to the PDF file, or an already-open fitz.Document
+             (an open document is not closed here, so the caller can keep
+             using the same handle for the OCR pass)
+
     Returns:
         True if the PDF needs OCR, False otherwise
     """
     try:
-        doc = fitz.open(pdf_path)
+        import fitz  # PyMuPDF
+
+        if isinstance(pdf, fitz.Document):
+            doc = pdf
+            owns_doc = False
+        else:
+            doc = fitz.open(pdf)
+            owns_doc = True
+
         total_text = 0
         has_images = False
-        
+
         # Check first few pages (up to 5)
         pages_to_check = min(5, len(doc))
-        
+
         for i in range(pages_to_check):
             page = doc[i]
-            
-            # Check if page has text
-            text = page.get_text()
+
+            # Check if page has text (flags=0: we only need the length, so
+            # skip ligature/whitespace/image handling during extraction)
+            text = page.get_text("text", flags=0)
             total_text += len(text)
-            
+
             # Check for images
             img_list = page.get_images(full=True)
             if len(img_list) > 0:
                 has_images = True
-        
-        doc.close()
-        
+
+        if owns_doc:
+            doc.close()
+
         # If there are images and little text, OCR might be needed
         if has_images and total_text < 100 * pages_to_check:
             return True
-        
+
         # If there's almost no text, OCR might be needed
         if total_text < 50 * pages_to_check:
             return True
-            
+
         return False
     except Exception as e:
         logger.warning(f"Error checking if PDF needs OCR: {e}. Assuming regular PDF.")
         return False
 
+def load_pdf_documents(file_path: str, doc: Optional["fitz.Document"] = None) -> List["Document"]:
+    """
+    Load a text-based PDF into per-page documents using PyMuPDF
+
+    PyMuPDF's text extraction is roughly an order of magnitude faster than
+    the pypdf-based PyPDFLoader on the same document, so this is the hot
+    path for text PDFs when OCR is disabled or not needed.
+
+    Args:
+        file_path: Path to the PDF file
+        doc: An already-open fitz.Document to reuse (not closed here)
+
+    Returns:
+        List of documents, one per page
+    """
+    from langchain_core.documents import Document
+
+    if doc is None:
+        import fitz  # PyMuPDF
+        doc = fitz.open(file_path)
+        owns_doc = True
+    else:
+        owns_doc = False
+
+    try:
+        return [
+            Document(
+                page_content=page.get_text("text"),
+                metadata={"source": file_path, "page": i}
+            )
+            for i, page in enumerate(doc)
+        ]
+    finally:
+        if owns_doc:
+            doc.close()
+
+def split_ocr_text_into_documents(text: str, source: str) -> List["Document"]:
+    """
+    Split OCR output on its page markers into per-page documents
+
+    Chunking each page independently keeps the strings the text splitter
+    works on small (a page instead of the whole document) and preserves the
+    page number in the chunk metadata.
+
+    Args:
+        text: OCR output containing '--- Page N ---' markers
+        source: Original file path to record in the metadata
+
+    Returns:
+        List of documents, one per page
+    """
+    from langchain_core.documents import Document
+
+    matches = list(_PAGE_MARKER_RE.finditer(text))
+    if not matches:
+        return [Document(page_content=text, metadata={"source": source})]
+
+    documents = []
+    for index, match in enumerate(matches):
+        start = match.end()
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        documents.append(Document(
+            page_content=text[start:end].strip('\n'),
+            metadata={"source": source, "page": int(match.group(1)) - 1}
+        ))
+    return documents
+
 def convert_xlsx_to_csv(xlsx_path: str) -> str:
     """
     Convert an Excel (XLSX) file to CSV format
@@ -122,8 +221,10 @@ def convert_xlsx_to_csv(xlsx_path: str) -> str:
         Path to the temporary CSV file
     """
     try:
+        import pandas as pd
+
         logger.info(f"Converting Excel file {xlsx_path} to CSV")
-        
+
         # Read the Excel file with pandas
         df = pd.read_excel(xlsx_path)
         
@@ -166,9 +267,11 @@ def load_document(file_path: str, ocr_enabled: bool = False, ocr_options: Option
     # Process XLSX files - convert to CSV first
     if file_extension.lower() == '.xlsx':
         try:
+            from langchain_community.document_loaders import TextLoader
+
             # Convert XLSX to CSV
             temp_csv_path = convert_xlsx_to_csv(file_path)
-            
+
             # Load the CSV file
             loader = TextLoader(temp_csv_path)
             documents = loader.load()
@@ -183,35 +286,51 @@ def load_document(file_path: str, ocr_enabled: bool = False, ocr_options: Option
     
     # Process PDF files
     elif file_extension.lower() == '.pdf':
+        # Open the document once; the same handle serves both the needs_ocr
+        # scan and the OCR pass, avoiding a second fitz.open + xref rebuild
+        pdf_doc = None
+        if ocr_enabled:
+            try:
+                import fitz  # PyMuPDF
+                pdf_doc = fitz.open(file_path)
+            except Exception as e:
+                logger.warning(f"Could not open PDF with PyMuPDF: {e}. Assuming regular PDF.")
+
         # Check if PDF needs OCR and OCR is enabled
-        if ocr_enabled and needs_ocr(file_path):
+        if pdf_doc is not None and needs_ocr(pdf_doc):
             logger.info(f"PDF appears to contain images or scanned content. Using OCR.")
-            
+
             # Get OCR text
             from .ocr import convert_pdf_to_text
-            
+
             # Create a temporary file for the OCR output
             with tempfile.NamedTemporaryFile(suffix='.txt', delete=False) as temp_file:
                 temp_path = temp_file.name
-            
+
             try:
                 # Perform OCR
                 logger.info(f"Processing {file_path} with OCR...")
                 convert_pdf_to_text(
-                    pdf_path=file_path,
+                    pdf_path=pdf_doc,
                     output_path=temp_path,
                     engine=ocr_options.get('engine', 'tesseract'),
                     lang=ocr_options.get('lang', 'eng'),
                     dpi=ocr_options.get('dpi', 300),
+                    num_workers=ocr_options.get('num_workers', None),
+                    batch_size=ocr_options.get('batch_size', 8),
+                    grayscale=ocr_options.get('grayscale', True),
+                    preprocess=ocr_options.get('preprocess', None),
                     use_gpu=ocr_options.get('use_gpu', True),
                     tesseract_cmd=ocr_options.get('tesseract_cmd', None),
                     tessdata_dir=ocr_options.get('tessdata_dir', None)
                 )
                 
-                # Load the OCR text
-                loader = TextLoader(temp_path)
-                documents = loader.load()
-                
+                # Load the OCR text, split per page so the chunker works on
+                # page-sized strings rather than the whole document
+                with open(temp_path, 'r', encoding='utf-8') as f:
+                    ocr_text = f.read()
+                documents = split_ocr_text_into_documents(ocr_text, file_path)
+
                 # Clean up temporary file
                 os.unlink(temp_path)
                 
@@ -222,29 +341,26 @@ def load_document(file_path: str, ocr_enabled: bool = False, ocr_options: Option
                     os.unlink(temp_path)
                     
                 # Fallback to regular PDF loading
-                loader = PyPDFLoader(file_path)
-                documents = loader.load()
+                documents = load_pdf_documents(file_path, doc=pdf_doc)
         else:
             # Regular PDF loading
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
+            documents = load_pdf_documents(file_path, doc=pdf_doc)
+
+        if pdf_doc is not None:
+            pdf_doc.close()
     
     # Process other file types
     elif file_extension.lower() == '.docx':
+        from langchain_community.document_loaders import Docx2txtLoader
         loader = Docx2txtLoader(file_path)
         documents = loader.load()
     elif file_extension.lower() in ['.txt', '.md', '.csv']:
+        from langchain_community.document_loaders import TextLoader
         loader = TextLoader(file_path)
         documents = loader.load()
     else:
         raise ValueError(f"Unsupported file type: {file_extension}")
-    
+
     # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len,
-    )
-    
-    chunks = text_splitter.split_documents(documents)
+    chunks = _get_text_splitter().split_documents(documents)
     return chunks
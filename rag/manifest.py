@@ -0,0 +1,143 @@
+"""
+Ingestion manifest for incremental re-indexing
+"""
+import os
+import json
+import sqlite3
+import hashlib
+from typing import List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Hash only the head and tail of each file: with the size mixed in this is
+# enough to detect changes, and it keeps the check at two reads per file
+_HASH_SAMPLE_SIZE = 64 * 1024
+
+# (mtime_ns, size, content_hash)
+Signature = Tuple[int, int, str]
+
+def get_manifest(persist_directory: str) -> sqlite3.Connection:
+    """
+    Open (creating if needed) the ingestion manifest next to the vector store
+
+    The manifest maps each ingested file to its stat info, a content hash,
+    and the chunk IDs it produced, so unchanged files can be skipped on
+    subsequent runs and stale chunks removed when a file changes.
+
+    Args:
+        persist_directory: Directory holding the vector store
+
+    Returns:
+        sqlite3 connection with the schema ensured
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(persist_directory, 'manifest.sqlite'))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS files ("
+        "path TEXT PRIMARY KEY, "
+        "mtime_ns INTEGER, "
+        "size INTEGER, "
+        "content_hash TEXT, "
+        "chunk_ids TEXT)"
+    )
+    conn.commit()
+    return conn
+
+def _signature(file_path: str, st: os.stat_result) -> Signature:
+    """
+    Compute the change-detection signature for a file
+
+    Args:
+        file_path: Path to the file
+        st: Stat result for the file
+
+    Returns:
+        (mtime_ns, size, content_hash) tuple
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(st.st_size).encode())
+
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(_HASH_SAMPLE_SIZE))
+        if st.st_size > 2 * _HASH_SAMPLE_SIZE:
+            f.seek(-_HASH_SAMPLE_SIZE, os.SEEK_END)
+            digest.update(f.read(_HASH_SAMPLE_SIZE))
+
+    return st.st_mtime_ns, st.st_size, digest.hexdigest()
+
+def check_file(conn: sqlite3.Connection, file_path: str) -> Tuple[bool, Signature]:
+    """
+    Check whether a file is unchanged since it was last ingested
+
+    Matching stat info (mtime + size) short-circuits without reading the
+    file; otherwise the content hash decides, so touched-but-identical
+    files are still skipped.
+
+    Args:
+        conn: Manifest connection
+        file_path: Absolute path to the file
+
+    Returns:
+        (unchanged, signature) tuple
+    """
+    st = os.stat(file_path)
+    row = conn.execute(
+        "SELECT mtime_ns, size, content_hash FROM files WHERE path = ?",
+        (file_path,)
+    ).fetchone()
+
+    if row is None:
+        return False, _signature(file_path, st)
+
+    mtime_ns, size, content_hash = row
+    if st.st_mtime_ns == mtime_ns and st.st_size == size:
+        return True, (mtime_ns, size, content_hash)
+
+    signature = _signature(file_path, st)
+    if signature[2] == content_hash:
+        # Same content, new stat info: refresh so the fast path hits next time
+        conn.execute(
+            "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+            (signature[0], signature[1], file_path)
+        )
+        conn.commit()
+        return True, signature
+
+    return False, signature
+
+def stale_chunk_ids(conn: sqlite3.Connection, file_path: str) -> List[str]:
+    """
+    Get the chunk IDs a file produced on its previous ingestion
+
+    Args:
+        conn: Manifest connection
+        file_path: Absolute path to the file
+
+    Returns:
+        List of chunk IDs, empty if the file was never ingested
+    """
+    row = conn.execute(
+        "SELECT chunk_ids FROM files WHERE path = ?", (file_path,)
+    ).fetchone()
+    if row is None or not row[0]:
+        return []
+    return json.loads(row[0])
+
+def record_file(conn: sqlite3.Connection, file_path: str, signature: Signature,
+                chunk_ids: List[str]):
+    """
+    Record a file's signature and the chunk IDs it produced
+
+    Args:
+        conn: Manifest connection
+        file_path: Absolute path to the file
+        signature: Signature returned by check_file
+        chunk_ids: Chunk IDs the vector store assigned to this file's chunks
+    """
+    conn.execute(
+        "INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash, chunk_ids) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (file_path, signature[0], signature[1], signature[2], json.dumps(list(chunk_ids)))
+    )
+    conn.commit()
@@ -26,19 +26,33 @@ def get_vector_store(persist_directory: str):
     # Return vector store
     return Chroma(persist_directory=persist_directory, embedding_function=embeddings)
 
-def add_documents(vector_store, documents: List[Document]):
+def add_documents(vector_store, documents: List[Document]) -> List[str]:
     """
     Add documents to the vector store
-    
+
     Args:
         vector_store: Vector store to add documents to
         documents: List of documents to add
-        
+
+    Returns:
+        List of IDs the store assigned to the documents, in order
+    """
+    return vector_store.add_documents(documents)
+
+def delete_documents(vector_store, ids: List[str]):
+    """
+    Delete documents from the vector store by ID
+
+    Args:
+        vector_store: Vector store to delete documents from
+        ids: IDs of the documents to delete
+
     Returns:
         None
     """
-    vector_store.add_documents(documents)
-    
+    if ids:
+        vector_store.delete(ids=ids)
+
 def similarity_search(vector_store, query: str, k: int = 4):
     """
     Search for similar documents in the vector store